@@ -4,19 +4,21 @@ from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import os
 import logging
+import json
 import math
-from pyrogram import Client, filters, enums
+import functools
+import re
+from pyrogram import Client, filters, enums, idle
 from pyrogram.types import Message, InlineKeyboardButton, InlineKeyboardMarkup
-from pyrogram.errors import FloodWait, ButtonUrlInvalid
-from pymongo import MongoClient, ASCENDING
+from pyrogram.errors import FloodWait, ButtonUrlInvalid, MessageNotModified
+from pymongo import MongoClient, IndexModel, ASCENDING
 import time
 import uuid
 import urllib.parse
-from urllib.parse import urlparse
-import requests
-from flask import Flask
-from typing import Optional, List, Tuple
-from threading import Thread, Event
+import aiohttp
+from aiohttp import web
+from typing import Optional, Dict, List, Tuple
+from threading import Event
 import signal
 import sys
 
@@ -31,26 +33,26 @@ logging.getLogger("pyrogram.session").setLevel(logging.ERROR)
 logging.getLogger("pyrogram.connection").setLevel(logging.ERROR)
 logging.getLogger("pyrogram.dispatcher").setLevel(logging.ERROR)
 
-aria2 = Aria2API(Aria2Client(host="http://localhost", port=6800, secret=""))
-aria2.set_global_options({
-    "max-tries": "50",
-    "retry-wait": "3",
-    "continue": "true",
-    "allow-overwrite": "true",
-    "min-split-size": "4M",
-    "split": "10"
-})
-
 VALID_DOMAINS = [
     'terabox.com', 'nephobox.com', '4funbox.com', 'mirrobox.com', 
     'momerybox.com', 'teraboxapp.com', '1024tera.com', 
     'terabox.app', 'gibibox.com', 'goaibox.com', 'terasharelink.com', 
     'teraboxlink.com', 'terafileshare.com'
 ]
+VALID_DOMAINS_RE = re.compile(
+    r'(?:^|\.)(?:' + '|'.join(re.escape(domain) for domain in VALID_DOMAINS) + r')$'
+)
+URL_RE = re.compile(r'https?://\S+', re.IGNORECASE)
+URL_HOST_RE = re.compile(r'https?://(?:[^/?#@]*@)?([^/?#:]+)', re.IGNORECASE)
 DEFAULT_SPLIT_SIZE = 2 * 1024**3
 VIP_SPLIT_SIZE = 4 * 1024**3
 UPDATE_INTERVAL = 15
+PROGRESS_EDIT_INTERVAL = 5
+EDIT_RETRIES = 3
 TOKEN_EXPIRY_HOURS = 12
+TOKEN_SWEEP_INTERVAL = 3600
+SHORTENER_RETRIES = 2
+MEMBERSHIP_CACHE_SECONDS = 300
 
 class Config:
     def __init__(self):
@@ -63,6 +65,12 @@ class Config:
         self.DATABASE_URL = self._get_env('DATABASE_URL', required=True)
         self.SHORTENER_API = self._get_env('SHORTENER_API')
         self.USER_SESSION_STRING = self._get_env('USER_SESSION_STRING')
+        self.mongo = MongoClient(
+            self.DATABASE_URL,
+            maxPoolSize=50,
+            minPoolSize=5,
+            serverSelectionTimeoutMS=5000
+        )
         self.aria2 = Aria2API(Aria2Client(host="http://localhost", port=6800, secret=""))
         self._configure_aria2()
         self._create_indexes()
@@ -86,41 +94,70 @@ class Config:
         self.aria2.set_global_options(options)
 
     def _create_indexes(self):
-        client = MongoClient(self.DATABASE_URL)
-        db = client["terabox"]
-        db["user_requests"].create_index([("user_id", ASCENDING)])
-        db["user_requests"].create_index([("token_expiry", ASCENDING)])
+        collection = self.mongo["terabox"]["user_requests"]
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("token", ASCENDING)], unique=True),
+            # Lets has_valid_token be answered from the index alone
+            IndexModel([("user_id", ASCENDING), ("token_status", ASCENDING), ("token_expiry", ASCENDING)]),
+            # token_expiry holds the absolute expiry time, so unused and expired tokens are reaped as soon as it passes
+            IndexModel(
+                [("token_expiry", ASCENDING)],
+                expireAfterSeconds=0,
+                partialFilterExpression={"token_status": {"$in": ["inactive", "expired"]}}
+            ),
+        ]
+        existing = collection.index_information()
+        for index in indexes:
+            spec = index.document
+            current = existing.get(spec["name"])
+            if current and any(current.get(k) != v for k, v in spec.items() if k not in ("name", "key")):
+                # An index on the same key with other options blocks the new one from being built
+                collection.drop_index(spec["name"])
+        collection.create_indexes(indexes)
+        if "user_id_1" in existing:
+            # Superseded by the (user_id, token) index, which serves user_id lookups as its prefix
+            collection.drop_index("user_id_1")
 
 config = Config()
 
 bot = Client("jetbot", api_id=config.API_ID, api_hash=config.API_HASH, bot_token=config.BOT_TOKEN)
 user_client = Client("jetu", api_id=config.API_ID, api_hash=config.API_HASH, session_string=config.USER_SESSION_STRING) if config.USER_SESSION_STRING else None
-client = MongoClient(config.DATABASE_URL)
-db = client["terabox"]
-collection = db["user_requests"]
-flask_app = Flask(__name__)
+collection = config.mongo["terabox"]["user_requests"]
+web_app = web.Application()
 shutdown_event = Event()
+http_session: Optional[aiohttp.ClientSession] = None
+member_cache: Dict[int, float] = {}
 # Utilities
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
 def format_size(size: int) -> str:
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size < 1024:
-            return f"{size:.2f} {unit}"
-        size /= 1024
-    return f"{size:.2f} TB"
-
-def generate_progress_bar(percent: float, length: int = 10) -> str:
-    filled = '★' * int(percent / 100 * length)
+    if size <= 0:
+        return "0.00 B"
+    i = min((size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{size / (1 << (10 * i)):.2f} {SIZE_UNITS[i]}"
+
+@functools.lru_cache(maxsize=256)
+def generate_progress_bar(percent: int, length: int = 10) -> str:
+    filled = '★' * (percent * length // 100)
     empty = '☆' * (length - len(filled))
     return f"[{filled}{empty}]"
 
 async def check_membership(client: Client, user_id: int) -> bool:
+    now = time.monotonic()
+    if member_cache.get(user_id, 0.0) > now:
+        return True
+    # Only positive results are cached, so a user who just joined is not locked out
+    member_cache.pop(user_id, None)
     try:
         member = await client.get_chat_member(config.FSUB_ID, user_id)
-        return member.status in [
+        is_member = member.status in [
             enums.ChatMemberStatus.MEMBER,
             enums.ChatMemberStatus.ADMINISTRATOR,
             enums.ChatMemberStatus.OWNER
         ]
+        if is_member:
+            member_cache[user_id] = now + MEMBERSHIP_CACHE_SECONDS
+        return is_member
     except Exception as e:
         logger.error(f"Membership check failed: {e}")
         return False
@@ -129,82 +166,129 @@ def generate_uuid(user_id: int) -> str:
     token = str(uuid.uuid4())
     collection.update_one(
         {"user_id": user_id},
-        {"$set": {"token": token, "token_status": "inactive", "token_expiry": None}},
+        {"$set": {"token": token, "token_status": "inactive",
+                  "token_expiry": datetime.utcnow() + timedelta(hours=TOKEN_EXPIRY_HOURS)}},
         upsert=True
     )
     return token
 
 def activate_token(user_id: int, token: str) -> bool:
-    result = collection.update_one(
-        {"user_id": user_id, "token": token},
-        {"$set": {"token_status": "active", 
-                 "token_expiry": datetime.now() + timedelta(hours=TOKEN_EXPIRY_HOURS)}}
+    # Only an unexpired inactive token can be activated, so a used link cannot extend its own session
+    now = datetime.utcnow()
+    user_data = collection.find_one_and_update(
+        {"user_id": user_id, "token": token, "token_status": "inactive", "token_expiry": {"$gt": now}},
+        {"$set": {"token_status": "active",
+                  "token_expiry": now + timedelta(hours=TOKEN_EXPIRY_HOURS)}},
+        projection={"_id": 1}
     )
-    return result.modified_count > 0
+    return user_data is not None
 
 def has_valid_token(user_id: int) -> bool:
-    user_data = collection.find_one({"user_id": user_id})
-    if user_data and user_data.get("token_status") == "active":
-        return datetime.now() < user_data.get("token_expiry", datetime.min)
-    return False
+    user_data = collection.find_one(
+        {"user_id": user_id, "token_status": "active", "token_expiry": {"$gt": datetime.utcnow()}},
+        {"_id": 0, "token_expiry": 1}
+    )
+    return user_data is not None
+
+async def expire_lapsed_tokens():
+    # Active tokens are exempt from the TTL index; marking lapsed ones expired hands them to it
+    while True:
+        try:
+            collection.update_many(
+                {"token_status": "active", "token_expiry": {"$lte": datetime.utcnow()}},
+                {"$set": {"token_status": "expired"}}
+            )
+        except Exception as e:
+            logger.error(f"Token expiry sweep failed: {e}")
+        await asyncio.sleep(TOKEN_SWEEP_INTERVAL)
 
 def is_valid_url(url: str) -> bool:
-    parsed = urlparse(url)
-    return any(parsed.netloc.endswith(domain) for domain in VALID_DOMAINS)
+    # Most words in a chat message are not URLs, and match() rejects them on the first characters
+    match = URL_HOST_RE.match(url)
+    return bool(match and VALID_DOMAINS_RE.search(match.group(1).lower()))
+
+def get_http_session() -> aiohttp.ClientSession:
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=5)
+        )
+    return http_session
 
-def shorten_url(url: str) -> Optional[str]:
+async def shorten_url(url: str) -> Optional[str]:
     if not config.SHORTENER_API:
         return url
-    try:
-        response = requests.get(
-            "https://linkcents.com/api",
-            params={"api": config.SHORTENER_API, "url": url}
-        )
-        return response.json().get("shortenedUrl", url)
-    except Exception as e:
-        logger.error(f"URL shortening failed: {e}")
-        return url
+    for attempt in range(SHORTENER_RETRIES + 1):
+        try:
+            async with get_http_session().get(
+                "https://linkcents.com/api",
+                params={"api": config.SHORTENER_API, "url": url}
+            ) as response:
+                data = await response.json(content_type=None)
+            return data.get("shortenedUrl", url)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if attempt == SHORTENER_RETRIES:
+                logger.error(f"URL shortening failed: {e}")
+                return url
+            await asyncio.sleep(0.3 * 2 ** attempt)
+        except Exception as e:
+            logger.error(f"URL shortening failed: {e}")
+            return url
 
 async def safe_edit(message: Message, text: str):
-    try:
-        await message.edit_text(text)
-    except FloodWait as e:
-        await asyncio.sleep(e.value)
-        await safe_edit(message, text)
-    except Exception as e:
-        logger.error(f"Message edit failed: {e}")
+    for attempt in range(EDIT_RETRIES):
+        try:
+            await message.edit_text(text)
+            return
+        except FloodWait as e:
+            if attempt == EDIT_RETRIES - 1:
+                break
+            await asyncio.sleep(e.value)
+        except MessageNotModified:
+            return
+        except Exception as e:
+            logger.error(f"Message edit failed: {e}")
+            return
+    logger.error(f"Message edit dropped after {EDIT_RETRIES} flood waits")
 
 async def generate_thumbnail(video_path: str) -> Optional[str]:
     thumbnail_path = f"{video_path}.jpg"
     try:
         proc = await asyncio.create_subprocess_exec(
-            "ffmpeg", "-ss", "00:00:01", "-i", video_path,
+            "ffmpeg", "-nostdin", "-v", "error", "-ss", "00:00:01", "-i", video_path,
             "-vframes", "1", "-vf", "scale=320:-1",
             "-y", thumbnail_path,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
-        await proc.wait()
+        await proc.communicate()
         return thumbnail_path if os.path.exists(thumbnail_path) else None
     except Exception as e:
         logger.error(f"Thumbnail generation failed: {e}")
         return None
 
-async def get_video_metadata(file_path: str) -> Tuple[int, int, int]:
+async def get_video_metadata(file_path: str) -> Tuple[float, int, int]:
     try:
         proc = await asyncio.create_subprocess_exec(
             "ffprobe", "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=duration,width,height",
-            "-of", "csv=p=0", file_path,
+            "-show_entries", "format=duration:stream=width,height",
+            "-of", "json", file_path,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
         stdout, _ = await proc.communicate()
-        duration, width, height = map(float, stdout.decode().strip().split(','))
-        return int(duration), int(width), int(height)
+        probe = json.loads(stdout)
+        duration = float(probe["format"]["duration"])
     except Exception as e:
         logger.error(f"Metadata extraction failed: {e}")
         return 0, 1280, 720
+    streams = probe.get("streams") or [{}]
+    width, height = streams[0].get("width"), streams[0].get("height")
+    if not width or not height:
+        # Files without a video stream (e.g. audio-only) still have a usable duration
+        return duration, 1280, 720
+    return duration, int(width), int(height)
 
 # Bot Handlers
 @bot.on_message(filters.command("start"))
@@ -220,13 +304,15 @@ async def start_handler(client: Client, message: Message):
         token = message.command[1]
         if activate_token(user_id, token):
             caption = "🌟 Your token has been activated! You can now use the bot."
+        elif has_valid_token(user_id):
+            caption = "✅ You already have an active token!"
         else:
             caption = "❌ Invalid token. Generate a new one using /start"
     else:
         if not has_valid_token(user_id):
             token = generate_uuid(user_id)
             long_url = f"https://redirect.jet-mirror.in/{client.me.username}/{token}"
-            short_url = shorten_url(long_url) or long_url
+            short_url = await shorten_url(long_url) or long_url
             buttons.insert(0, [InlineKeyboardButton("🔑 Generate Token", url=short_url)])
             caption = "🔑 Generate your access token (Valid for 12 hours)"
         else:
@@ -255,7 +341,7 @@ async def handle_message(client: Client, message: Message):
                 [InlineKeyboardButton("Join Channel", url="https://t.me/tellycloudbots")]
             ]))
     
-    url = next((word for word in message.text.split() if is_valid_url(word)), None)
+    url = next((match.group(0) for match in URL_RE.finditer(message.text) if is_valid_url(match.group(0))), None)
     if not url:
         return await message.reply_text("❌ Invalid Terabox link. Please provide a valid URL.")
     
@@ -279,18 +365,18 @@ async def process_download(client: Client, message: Message, url: str, user_id:
         await cleanup(download, status_message, message)
 
 async def track_download_progress(download, status_message, user_id):
-    start_time = datetime.now()
+    start_time = time.monotonic()
     while not download.is_complete:
         await asyncio.sleep(UPDATE_INTERVAL)
         download.update()
         
-        elapsed = datetime.now() - start_time
+        elapsed = int(time.monotonic() - start_time)
         progress_text = (
             f"📥 Downloading: {download.name}\n"
-            f"{generate_progress_bar(download.progress)}\n"
+            f"{generate_progress_bar(int(download.progress))}\n"
             f"📦 {format_size(download.completed_length)}/{format_size(download.total_length)}\n"
             f"⚡ {format_size(download.download_speed)}/s\n"
-            f"⏳ Elapsed: {elapsed.seconds // 60}m {elapsed.seconds % 60}s"
+            f"⏳ Elapsed: {elapsed // 60}m {elapsed % 60}s"
         )
         await safe_edit(status_message, progress_text)
 
@@ -298,48 +384,57 @@ async def handle_upload(download, client, message, status_message):
     file_path = download.files[0].path
     file_size = os.path.getsize(file_path)
     split_size = VIP_SPLIT_SIZE if user_client else DEFAULT_SPLIT_SIZE
+    metadata, thumbnail = await asyncio.gather(
+        get_video_metadata(file_path),
+        generate_thumbnail(file_path)
+    )
     
-    if file_size > split_size:
-        await split_and_upload(file_path, message, status_message)
-    else:
-        await direct_upload(file_path, message, status_message)
+    try:
+        if file_size > split_size:
+            await split_and_upload(file_path, metadata, thumbnail, message, status_message)
+        else:
+            await direct_upload(file_path, metadata, thumbnail, message, status_message)
+    finally:
+        if thumbnail and os.path.exists(thumbnail):
+            os.remove(thumbnail)
 
-async def split_and_upload(file_path, message, status_message):
+async def split_and_upload(file_path, metadata, thumbnail, message, status_message):
+    split_files = []
     try:
-        split_files = await split_video(file_path, status_message)
+        duration, width, height = metadata
+        split_files = await split_video(file_path, duration, status_message)
+        part_metadata = (duration / len(split_files), width, height)
         for part in split_files:
-            await upload_file(part, message, status_message)
+            await upload_file(part, part_metadata, thumbnail, message, status_message)
     finally:
         for part in split_files:
             safe_remove(part)
 
-async def direct_upload(file_path, message, status_message):
+async def direct_upload(file_path, metadata, thumbnail, message, status_message):
     try:
-        await upload_file(file_path, message, status_message)
+        await upload_file(file_path, metadata, thumbnail, message, status_message)
     finally:
         safe_remove(file_path)
 
-async def upload_file(file_path: str, message: Message, status_message: Message):
+async def upload_file(file_path: str, metadata: Tuple[float, int, int], thumbnail: Optional[str],
+                      message: Message, status_message: Message):
     caption = f"✨ {os.path.basename(file_path)}\n👤 User: {message.from_user.mention}"
     client = user_client or bot
-    thumbnail = None
 
     try:
-        thumbnail = await generate_thumbnail(file_path)
-        duration, width, height = await get_video_metadata(file_path)
+        duration, width, height = metadata
         
         msg = await client.send_video(
             chat_id=config.DUMP_CHAT_ID,
             video=file_path,
             caption=caption,
-            duration=duration,
+            duration=int(duration),
             width=width,
             height=height,
             thumb=thumbnail,
             supports_streaming=True,
-            progress=lambda current, total: asyncio.create_task(
-                upload_progress(current, total, status_message)
-            )
+            progress=upload_progress,
+            progress_args=(status_message,)
         )
   # Fixed closing parenthesis here
         
@@ -347,48 +442,69 @@ async def upload_file(file_path: str, message: Message, status_message: Message)
     except Exception as e:
         logger.error(f"Upload failed: {e}")
         await status_message.edit_text("⚠️ Failed to upload file. Please try again.")
-    finally:
-        if thumbnail and os.path.exists(thumbnail):
-            os.remove(thumbnail)
 
 async def upload_progress(current: int, total: int, status_message: Message):
+    now = time.monotonic()
+    if current < total and now - getattr(status_message, "_last_edit", 0.0) < PROGRESS_EDIT_INTERVAL:
+        return
     progress = (current / total) * 100
+    text = (
+        f"📤 Upload Progress\n"
+        f"{generate_progress_bar(int(progress))}\n"
+        f"📊 {format_size(current)}/{format_size(total)}"
+    )
+    if text == getattr(status_message, "_last_text", ""):
+        return
+    status_message._last_edit = now
+    status_message._last_text = text
     try:
-        await status_message.edit_text(
-            f"📤 Upload Progress\n"
-            f"{generate_progress_bar(progress)}\n"
-            f"📊 {format_size(current)}/{format_size(total)}"
-        )
+        await status_message.edit_text(text)
     except Exception as e:
         logger.error(f"Progress update failed: {e}")
 
-async def split_video(input_path: str, status_message: Message) -> List[str]:
+async def split_video(input_path: str, total_duration: float, status_message: Message) -> List[str]:
     try:
-        proc = await asyncio.create_subprocess_exec(
-            "ffprobe", "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", input_path,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, _ = await proc.communicate()
-        total_duration = float(stdout.decode().strip())
-        
+        if total_duration <= 0:
+            raise ValueError(f"Unknown duration for {input_path}")
+
         file_size = os.path.getsize(input_path)
         parts = math.ceil(file_size / DEFAULT_SPLIT_SIZE)
         duration_per_part = total_duration / parts
-        split_files = []
-        
-        for i in range(parts):
-            output_path = f"{os.path.splitext(input_path)[0]}.part{i+1:03d}{os.path.splitext(input_path)[1]}"
-            cmd = [
-                "ffmpeg", "-y", "-ss", str(i * duration_per_part),
-                "-i", input_path, "-t", str(duration_per_part),
-                "-c", "copy", output_path
-            ]
-            proc = await asyncio.create_subprocess_exec(*cmd)
-            await proc.wait()
-            split_files.append(output_path)
-        
+        base, ext = os.path.splitext(input_path)
+        split_files = [f"{base}.part{i+1:03d}{ext}" for i in range(parts)]
+        # Stream copies are disk-bound, so cap concurrency rather than starting every part at once
+        semaphore = asyncio.BoundedSemaphore(min(parts, os.cpu_count() or 1))
+
+        async def run_split(i: int):
+            async with semaphore:
+                cmd = [
+                    "ffmpeg", "-nostdin", "-v", "error", "-y", "-ss", str(i * duration_per_part),
+                    "-i", input_path, "-t", str(duration_per_part),
+                    "-c", "copy", split_files[i]
+                ]
+                proc = await asyncio.create_subprocess_exec(*cmd)
+                try:
+                    returncode = await proc.wait()
+                except asyncio.CancelledError:
+                    if proc.returncode is None:
+                        proc.kill()
+                        await proc.wait()
+                    raise
+                if returncode != 0:
+                    raise RuntimeError(f"ffmpeg exited with code {returncode} for {split_files[i]}")
+
+        tasks = [asyncio.create_task(run_split(i)) for i in range(parts)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the remaining parts and drop partial outputs; the caller never sees these paths
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for path in split_files:
+                if os.path.exists(path):
+                    safe_remove(path)
+            raise
         return split_files
     except Exception as e:
         logger.error(f"Video splitting failed: {e}")
@@ -409,6 +525,35 @@ async def cleanup(download, status_message, original_message):
     except Exception as e:
         logger.error(f"Cleanup failed: {e}")
 
+# Web Server
+async def index_handler(request: web.Request) -> web.FileResponse:
+    return web.FileResponse(os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "index.html"))
+
+web_app.router.add_get("/", index_handler)
+
+async def start_web_server(port: int) -> web.AppRunner:
+    runner = web.AppRunner(web_app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    return runner
+
+async def main():
+    runner = await start_web_server(int(os.environ.get("PORT", 5000)))
+    if user_client:
+        await user_client.start()
+    await bot.start()
+    token_sweeper = asyncio.create_task(expire_lapsed_tokens())
+    try:
+        await idle()
+    finally:
+        token_sweeper.cancel()
+        await bot.stop()
+        if user_client:
+            await user_client.stop()
+        if http_session and not http_session.closed:
+            await http_session.close()
+        await runner.cleanup()
+
 # Signal Handling
 def signal_handler(sig, frame):
     logger.info("Shutting down gracefully...")
@@ -419,10 +564,4 @@ signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5000))
-    flask_thread = Thread(target=lambda: flask_app.run(host='0.0.0.0', port=port))
-    flask_thread.daemon = True
-    flask_thread.start()
-    if user_client:
-        user_client.start()
-    bot.run()
+    bot.run(main())